@@ -1,3 +1,2 @@
-from mongo_api import MongoAPI, string_to_object_id, object_id_to_string
-from mongo_api import string_to_object_id as stoi
-from mongo_api import object_id_to_string as otis
\ No newline at end of file
+from mongo_api import MongoAPI
+from async_mongo_api import AsyncMongoAPI
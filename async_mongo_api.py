@@ -0,0 +1,674 @@
+from typing import Union
+from urllib.parse import quote_plus
+import asyncio
+import threading
+import warnings
+
+import bson
+import pymongo
+
+# One AsyncMongoClient per (connection string, event loop). Frameworks that build an AsyncMongoAPI per request
+# or per worker would otherwise each open their own connection pool and TCP handshakes.
+_CLIENT_POOL: dict = {}
+_CLIENT_REFS: dict = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
+# Projection applied by find/find_one/find_one_and_update whenever the caller passes projection_dict=None.
+# Leave as None to fetch full documents (a warning is emitted once per collection in that case).
+DEFAULT_PROJECTION: dict = None
+
+# Interned projection shapes, keyed by their items. Callers tend to pass the same projection literal on every
+# call; caching the SON lets the BSON encoder skip re-ordering the dict each time.
+_PROJECTION_CACHE: dict = {}
+
+# When True, aggregate warns about pipelines whose first stage is not $match or $geoNear, since those cannot use
+# an index and scan the full collection.
+DEBUG_PIPELINE_CHECKS: bool = False
+
+
+class AsyncMongoAPI:
+    client: pymongo.AsyncMongoClient
+    db_name: str
+
+    # set once the untested-code warning has been emitted, so it fires once per process instead of per import
+    _warned = False
+
+    async def close(self):
+        """
+        Close the connection to MongoDB. The underlying client is shared, so it is only closed once the last
+        AsyncMongoAPI using it is closed.
+
+        :return:
+        """
+        with _CLIENT_POOL_LOCK:
+            refs = _CLIENT_REFS.get(self._pool_key, 1) - 1
+            if refs > 0:
+                _CLIENT_REFS[self._pool_key] = refs
+                return
+            _CLIENT_REFS.pop(self._pool_key, None)
+            _CLIENT_POOL.pop(self._pool_key, None)
+
+        await self.client.close()
+
+    def __init__(self, db_address: str,
+                 db_name: str,
+                 db_username: str,
+                 db_password: str,
+                 service: str = "mongodb",
+                 **kwargs):
+        """
+        :param db_address: Database Address like db.something.mongodb.net
+        :param db_name: name of the database
+        :param db_username: username
+        :param db_password: password to username
+
+        :param kwargs: Passed to the AsyncMongoClient.__init__ method. (i.e. tlsCAFile=certifi.where())
+        """
+        if not AsyncMongoAPI._warned:
+            AsyncMongoAPI._warned = True
+            warnings.warn("The AsyncMongoAPI code is untested and may have bugs.", stacklevel=2)
+
+        if service not in ("mongodb+srv", "mongodb"):
+            raise ValueError("service must be either 'mongodb+srv' or 'mongodb'")
+
+        # credentials are URL-quoted so characters like @ : / don't break the URI, and the pool key stays canonical
+        uri = (f"{service}://{quote_plus(db_username)}:{quote_plus(db_password)}@{db_address}/"
+               f"{db_name}?retryWrites=true&w=majority")
+
+        try:
+            loop_id = id(asyncio.get_running_loop())
+        except RuntimeError:
+            loop_id = None
+
+        # initialising connection to Mongo, reusing the pooled client for this URI and event loop if one exists
+        self._pool_key = (uri, loop_id)
+
+        with _CLIENT_POOL_LOCK:
+            client = _CLIENT_POOL.get(self._pool_key)
+            if client is None:
+                client = pymongo.AsyncMongoClient(uri, **kwargs)
+                _CLIENT_POOL[self._pool_key] = client
+            _CLIENT_REFS[self._pool_key] = _CLIENT_REFS.get(self._pool_key, 0) + 1
+
+        self.client = client
+
+        self.db_name = db_name
+        self._projection_warned = set()
+        self._col_cache = {}
+        self._batch_pending = {}
+
+    def collection(self, collection: str):
+        """
+        Get the AsyncCollection object for the given name. Collection objects are cached per name, so repeated
+        calls skip the Database/Collection wrapper allocations the client indexing would otherwise do.
+
+        :param collection: Collection name string
+
+        :return: AsyncCollection object
+        """
+        return self._col_cache.setdefault(collection, self.client[self.db_name][collection])
+
+    def _resolve_projection(self, collection: str, projection_dict: dict):
+        """
+        Fall back to DEFAULT_PROJECTION when no projection is given and warn once per collection if documents
+        are fetched in full.
+
+        :param collection: Collection name string
+        :param projection_dict: A dict of field names that should be returned in the result
+
+        :return: projection to pass to the driver
+        """
+        if projection_dict is None:
+            projection_dict = DEFAULT_PROJECTION
+
+        if projection_dict is None and collection not in self._projection_warned:
+            self._projection_warned.add(collection)
+            warnings.warn(f"No projection specified for collection '{collection}' — full documents are fetched. "
+                          f"Pass projection_dict to reduce network payload.", stacklevel=3)
+
+        if type(projection_dict) is dict:
+            try:
+                cache_key = frozenset(projection_dict.items())
+            except TypeError:
+                # unhashable projection values (e.g. $slice with a list) can't be interned
+                return projection_dict
+            return _PROJECTION_CACHE.setdefault(cache_key, bson.SON(projection_dict))
+
+        return projection_dict
+
+    async def find_one(self, collection: str, filter_dict: dict = None, projection_dict: dict = None,
+                       sort: list = None, read_preference=None, hint: Union[str, dict] = None):
+        """
+        Query the database.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the res
+        :param projection_dict: A dict of field names that should be returned in the result
+        :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+        :param hint: Index name or index spec dict the server should use. With a projection matched by the index
+            this makes the query fully index-covered — no document is fetched at all
+
+        :return:
+        """
+        projection_dict = self._resolve_projection(collection, projection_dict)
+
+        col = self.collection(collection)
+        if read_preference is not None:
+            col = col.with_options(read_preference=read_preference)
+
+        return await col.find_one(filter_dict, projection_dict, sort=sort, hint=hint)
+
+    async def gather_find_one(self, collection: str, filters: list, projection_dict: dict = None) -> list:
+        """
+        Run one find_one per filter concurrently instead of awaiting them in sequence. The lookups are dispatched
+        together over the driver's connection pool, so wall-clock time drops from the sum of the latencies to
+        roughly the slowest one.
+
+        :param collection: Collection name string
+        :param filters: A list of filter dicts, one per lookup
+        :param projection_dict: A dict of field names that should be returned in the result
+
+        :return: list of results in the same order as filters, None where nothing matched
+        """
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self.find_one(collection, filter_dict, projection_dict))
+                     for filter_dict in filters]
+
+        return [task.result() for task in tasks]
+
+    async def find_one_batched(self, collection: str, key: str, value, projection_dict: dict = None):
+        """
+        Look up a single document by key, coalescing concurrent lookups into one query. Calls made within the same
+        event-loop iteration are collected and sent to the server as a single {key: {$in: [...]}} find, turning N
+        round-trips into one. The projection of the first call in a burst is used for the whole batch; the key
+        field is always included so results can be routed back.
+
+        :param collection: Collection name string
+        :param key: Field name to match on
+        :param value: Value the field must equal
+        :param projection_dict: A dict of field names that should be returned in the result
+
+        :return: the matching document or None
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self._batch_pending.get((collection, key))
+        if pending is None:
+            self._batch_pending[(collection, key)] = pending = []
+
+            if projection_dict is not None and not projection_dict.get(key):
+                projection_dict = {**projection_dict, key: 1}
+
+            loop.call_later(0, loop.create_task, self._flush_batch(collection, key, projection_dict))
+
+        pending.append((value, future))
+
+        return await future
+
+    async def _flush_batch(self, collection: str, key: str, projection_dict: dict):
+        """
+        Run the coalesced $in query for all lookups queued by find_one_batched and resolve their futures.
+
+        :param collection: Collection name string
+        :param key: Field name to match on
+        :param projection_dict: A dict of field names that should be returned in the result
+
+        :return:
+        """
+        pending = self._batch_pending.pop((collection, key), None)
+        if not pending:
+            return
+
+        values = [value for value, _ in pending]
+
+        try:
+            documents = await self.find(collection, filter_dict={key: {"$in": values}},
+                                        projection_dict=projection_dict)
+        except Exception as error:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        by_value = {document[key]: document for document in documents if key in document}
+
+        for value, future in pending:
+            if not future.done():
+                future.set_result(by_value.get(value))
+
+    def _find_cursor(self, collection: str, filter_dict: dict = None, projection_dict: dict = None,
+                     sort: list = None, skip: int = 0, limit: int = 0, batch_size: int = 0, read_preference=None,
+                     hint: Union[str, dict] = None):
+        """
+        Build the AsyncCursor shared by find and find_iter.
+
+        :return: AsyncCursor
+        """
+        projection_dict = self._resolve_projection(collection, projection_dict)
+
+        col = self.collection(collection)
+        if read_preference is not None:
+            col = col.with_options(read_preference=read_preference)
+
+        return col.find(filter_dict, projection_dict, skip, limit, sort=sort, batch_size=batch_size, hint=hint)
+
+    async def find(self, collection: str, filter_dict: dict = None, projection_dict: dict = None, sort: list = None,
+                   skip: int = 0, limit: int = 0, batch_size: int = 0, read_preference=None,
+                   hint: Union[str, dict] = None, length: int = None):
+        """
+        Query the database.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param projection_dict: A dict of field names that should be returned in the result
+        :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param skip: Number of documents in order to skip
+        :param limit: Number of documents to return
+        :param batch_size: Number of documents fetched per round-trip (0 uses the server default). Lower values
+            reduce peak memory at the cost of more round-trips, higher values the opposite
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+        :param hint: Index name or index spec dict the server should use. With a projection matched by the index
+            this makes the query fully index-covered — no document is fetched at all
+        :param length: Maximum number of documents to return (None returns all), passed to the cursor's to_list
+
+        :return:
+        """
+
+        cur = self._find_cursor(collection, filter_dict=filter_dict, projection_dict=projection_dict, sort=sort,
+                                skip=skip, limit=limit, batch_size=batch_size, read_preference=read_preference,
+                                hint=hint)
+
+        # to_list drains the cursor batch-wise instead of re-entering the event loop once per document
+        return await cur.to_list(length=length)
+
+    async def find_iter(self, collection: str, filter_dict: dict = None, projection_dict: dict = None,
+                        sort: list = None, skip: int = 0, limit: int = 0, batch_size: int = 0,
+                        read_preference=None, hint: Union[str, dict] = None):
+        """
+        Query the database, yielding documents one at a time instead of loading the whole result into memory.
+        Use this instead of find for large result sets, as memory stays bounded to one server batch.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param projection_dict: A dict of field names that should be returned in the result
+        :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param skip: Number of documents in order to skip
+        :param limit: Number of documents to return
+        :param batch_size: Number of documents fetched per round-trip (0 uses the server default). Lower values
+            reduce peak memory at the cost of more round-trips, higher values the opposite
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+        :param hint: Index name or index spec dict the server should use. With a projection matched by the index
+            this makes the query fully index-covered — no document is fetched at all
+
+        :return: async generator of documents
+        """
+
+        async for document in self._find_cursor(collection, filter_dict=filter_dict,
+                                                projection_dict=projection_dict, sort=sort, skip=skip, limit=limit,
+                                                batch_size=batch_size, read_preference=read_preference, hint=hint):
+            yield document
+
+    async def find_fields(self, collection: str, filter_dict: dict = None, fields: list = None, sort: list = None,
+                          skip: int = 0, limit: int = 0):
+        """
+        Query the database, returning only the given fields. Builds the projection dict for you; _id is excluded
+        unless explicitly listed in fields.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param fields: A list of field names that should be returned in the result
+        :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param skip: Number of documents in order to skip
+        :param limit: Number of documents to return
+
+        :return:
+        """
+        projection_dict = {f: 1 for f in fields}
+        if "_id" not in projection_dict:
+            projection_dict["_id"] = 0
+
+        return await self.find(collection, filter_dict=filter_dict, projection_dict=projection_dict, sort=sort,
+                               skip=skip, limit=limit)
+
+    async def find_many_by_key(self, collection: str, key: str, values: list, projection_dict: dict = None) -> dict:
+        """
+        Look up many documents by key with a single $in query instead of one find_one per value. The key field is
+        always included in the projection so results can be mapped back.
+
+        :param collection: Collection name string
+        :param key: Field name to match on
+        :param values: The values the field may equal
+        :param projection_dict: A dict of field names that should be returned in the result
+
+        :return: dict mapping each found value to its document
+        """
+        if projection_dict is not None and not projection_dict.get(key):
+            projection_dict = {**projection_dict, key: 1}
+
+        documents = await self.find(collection, filter_dict={key: {"$in": values}}, projection_dict=projection_dict)
+
+        return {document[key]: document for document in documents if key in document}
+
+    async def insert_one(self, collection: str, document_dict: dict = None):
+        """
+        Insert a single document.
+
+        :param collection: Collection name string
+        :param document_dict:  The document to insert
+
+        :return: inserted id
+        """
+        if document_dict is None:
+            # inserting a bogus empty document is almost certainly a caller bug — fail before hitting the wire
+            raise ValueError("document_dict is required")
+
+        col = self.collection(collection)
+
+        result = await col.insert_one(document_dict)
+
+        return result.inserted_id
+
+    async def insert(self, collection: str, document_list: list = None, ordered: bool = False,
+                     batch_size: int = 1000, fast: bool = False):
+        """
+        Insert an iterable of documents. Documents are inserted in chunks of batch_size to stay below the 16 MiB
+        BSON command limit on large loads.
+
+        :param collection: Collection name string
+        :param document_list:  The documents to insert into the db. Needs to be a list containing documents
+        :param ordered: If True, documents are inserted in order and the first error aborts the batch. Unordered
+            inserts let the server parallelize the work
+        :param batch_size: Number of documents sent per insert_many command
+        :param fast: If True, insert with write concern w=0, skipping the acknowledgement round-trip per batch
+
+        :return: inserted ids
+        """
+        if document_list is None or len(document_list) < 1:
+            return
+
+        col = self.collection(collection)
+
+        if fast:
+            col = col.with_options(write_concern=pymongo.WriteConcern(w=0))
+
+        inserted_ids = []
+        for i in range(0, len(document_list), batch_size):
+            result = await col.insert_many(document_list[i:i + batch_size], ordered=ordered)
+            inserted_ids.extend(result.inserted_ids)
+
+        return inserted_ids
+
+    async def insert_fast(self, collection: str, document_list: list = None, batch_size: int = 1000) -> None:
+        """
+        Insert an iterable of documents with write concern w=0 and without collecting inserted ids. Use this on
+        bulk-load paths where the ids are not needed — it skips both the acknowledgement round-trip per batch and
+        the allocation of one ObjectId per document.
+
+        :param collection: Collection name string
+        :param document_list:  The documents to insert into the db. Needs to be a list containing documents
+        :param batch_size: Number of documents sent per insert_many command
+
+        :return:
+        """
+        if document_list is None or len(document_list) < 1:
+            return
+
+        col = self.collection(collection).with_options(write_concern=pymongo.WriteConcern(w=0))
+
+        for i in range(0, len(document_list), batch_size):
+            await col.insert_many(document_list[i:i + batch_size], ordered=False)
+
+    async def bulk(self, collection: str, operations: list, ordered: bool = False):
+        """
+        Send a mixed batch of write operations in a single round-trip instead of one per operation.
+
+        :param collection: Collection name string
+        :param operations: A list of pymongo.InsertOne/UpdateOne/UpdateMany/ReplaceOne/DeleteOne/DeleteMany
+            instances
+        :param ordered: If True, operations are applied in order and the first error aborts the batch. Unordered
+            batches let the server parallelize the work
+
+        :return: BulkWriteResult
+        """
+
+        col = self.collection(collection)
+
+        return await col.bulk_write(operations, ordered=ordered)
+
+    async def update_one(self, collection: str, filter_dict: dict = None, update_dict: dict | list = None,
+                         upsert: bool = False):
+        """
+        Update a single document matching the filter.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param update_dict: A dict with the modifications to apply
+        :param upsert: If True, perform an insert if no documents match the filter
+
+        :return: modified count
+        """
+        if update_dict is None:
+            # the server would reject an empty update anyway — fail before wasting the round-trip
+            raise ValueError("update_dict is required")
+
+        col = self.collection(collection)
+
+        result = await col.update_one(filter_dict, update_dict, upsert)
+
+        return result.modified_count
+
+    async def update(self, collection: str, filter_dict: dict = None, update_dict: Union[list, dict] = None,
+                     upsert: bool = False):
+        """
+        Update one or more documents that match the filter.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param update_dict: A dict with the modifications to apply
+        :param upsert: If True, perform an insert if no documents match the filter
+
+        :return: modified count
+        """
+        if update_dict is None:
+            # the server would reject an empty update anyway — fail before wasting the round-trip
+            raise ValueError("update_dict is required")
+
+        col = self.collection(collection)
+
+        result = await col.update_many(filter_dict, update_dict, upsert)
+
+        return result.modified_count
+
+    async def delete_one(self, collection: str, filter_dict: dict = None):
+        """
+        Delete a single document matching the filter.
+
+        :param collection: Collection name string
+        :param filter_dict A dict specifying elements which must be present for a document to be included in the result
+
+        :return: deleted count
+        """
+
+        col = self.collection(collection)
+
+        result = await col.delete_one(filter_dict)
+
+        return result.deleted_count
+
+    async def delete(self, collection: str, filter_dict: dict = None):
+        """
+        Delete one or more documents matching the filter.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+
+        :return: deleted count
+        """
+
+        col = self.collection(collection)
+
+        result = await col.delete_many(filter_dict)
+
+        return result.deleted_count
+
+    async def count(self, collection: str, filter_dict: dict = None, estimated: bool = False):
+        """
+        Count the number of documents in this collection.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param estimated: If True and no filter is given, return the metadata-based estimate instead of scanning
+            the collection
+
+        :return:
+        """
+        if estimated and not filter_dict:
+            return await self.count_estimated(collection)
+
+        if filter_dict is None:
+            filter_dict = {}
+
+        col = self.collection(collection)
+        return await col.count_documents(filter_dict)
+
+    async def count_estimated(self, collection: str) -> int:
+        """
+        Estimate the number of documents in this collection from collection metadata. Unlike count with an empty
+        filter, which scans the whole collection, this is O(1) — use it when a ballpark figure is enough
+        (dashboards, pagination hints).
+
+        :param collection: Collection name string
+
+        :return: estimated document count
+        """
+
+        col = self.collection(collection)
+        return await col.estimated_document_count()
+
+    async def _aggregate_cursor(self, collection: str, pipeline: list = None, batch_size: int = 0,
+                                allow_disk_use: bool = False, max_time_ms: int = None,
+                                hint: Union[str, dict] = None, read_preference=None):
+        """
+        Build the AsyncCommandCursor shared by aggregate and aggregate_iter.
+
+        :return: AsyncCommandCursor
+        """
+        if pipeline is None:
+            pipeline = []
+
+        if DEBUG_PIPELINE_CHECKS and pipeline and not ("$match" in pipeline[0] or "$geoNear" in pipeline[0]):
+            warnings.warn(f"Aggregation on '{collection}' does not start with $match or $geoNear — the pipeline "
+                          f"cannot use an index and scans the full collection. Consider a $match (and an early "
+                          f"$project to shrink inter-stage documents).", stacklevel=4)
+
+        options = {}
+        if batch_size:
+            options["batchSize"] = batch_size
+        if max_time_ms is not None:
+            options["maxTimeMS"] = max_time_ms
+        if hint is not None:
+            options["hint"] = hint
+
+        col = self.collection(collection)
+        if read_preference is not None:
+            col = col.with_options(read_preference=read_preference)
+
+        return await col.aggregate(pipeline, allowDiskUse=allow_disk_use, **options)
+
+    async def aggregate(self, collection: str, pipeline: list = None, batch_size: int = 0,
+                        allow_disk_use: bool = False, max_time_ms: int = None, hint: Union[str, dict] = None,
+                        read_preference=None, length: int = None):
+        """
+        Perform an aggregation using the aggregation framework on this collection.
+
+        :param collection: Collection name string
+        :param pipeline: A list of aggregation pipeline stages
+        :param batch_size: Number of documents fetched per round-trip (0 uses the server default). Lower values
+            reduce peak memory at the cost of more round-trips, higher values the opposite
+        :param allow_disk_use: If True, sort and group stages may spill to disk instead of failing on the 100 MB
+            per-stage memory limit
+        :param max_time_ms: Maximum server-side execution time in milliseconds
+        :param hint: Index name or index spec dict the server should use
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+        :param length: Maximum number of documents to return (None returns all), passed to the cursor's to_list
+
+        :return:
+        """
+
+        cur = await self._aggregate_cursor(collection, pipeline=pipeline, batch_size=batch_size,
+                                           allow_disk_use=allow_disk_use, max_time_ms=max_time_ms, hint=hint,
+                                           read_preference=read_preference)
+
+        # to_list drains the cursor batch-wise instead of re-entering the event loop once per document
+        return await cur.to_list(length=length)
+
+    async def aggregate_iter(self, collection: str, pipeline: list = None, batch_size: int = 0,
+                             allow_disk_use: bool = False, max_time_ms: int = None, hint: Union[str, dict] = None,
+                             read_preference=None):
+        """
+        Perform an aggregation, yielding result documents one at a time instead of loading the whole result into
+        memory. Use this instead of aggregate for large result sets.
+
+        :param collection: Collection name string
+        :param pipeline: A list of aggregation pipeline stages
+        :param batch_size: Number of documents fetched per round-trip (0 uses the server default). Lower values
+            reduce peak memory at the cost of more round-trips, higher values the opposite
+        :param allow_disk_use: If True, sort and group stages may spill to disk instead of failing on the 100 MB
+            per-stage memory limit
+        :param max_time_ms: Maximum server-side execution time in milliseconds
+        :param hint: Index name or index spec dict the server should use
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+
+        :return: async generator of documents
+        """
+
+        async for document in await self._aggregate_cursor(collection, pipeline=pipeline, batch_size=batch_size,
+                                                           allow_disk_use=allow_disk_use, max_time_ms=max_time_ms,
+                                                           hint=hint, read_preference=read_preference):
+            yield document
+
+    async def find_one_and_update(self,
+                                  collection: str,
+                                  update_dict: Union[list, dict],
+                                  filter_dict: Union[dict, list] = None,
+                                  projection_dict: dict = None,
+                                  sort: list = None,
+                                  array_filters: list = None,
+                                  return_document: pymongo.ReturnDocument = pymongo.ReturnDocument.AFTER) -> dict | None:
+        """
+        Find a document and update it in one atomic operation.
+
+        :param collection: Collection name string
+        :param update_dict: A dict with the modifications to apply
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param projection_dict: A dict of field names that should be returned in the result
+        :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param array_filters: A list of filters determining which array elements the $[<identifier>] update
+            operators apply to. Lets N array-element edits happen in one server-side operation instead of N updates
+        :param return_document: state in which the document is to be returned.
+
+        :return:
+        """
+        if filter_dict is None:
+            filter_dict = {}
+
+        projection_dict = self._resolve_projection(collection, projection_dict)
+
+        col = self.collection(collection)
+
+        result = await col.find_one_and_update(filter_dict,
+                                               update_dict,
+                                               projection_dict,
+                                               sort=sort,
+                                               array_filters=array_filters,
+                                               # INFO, that's correct pymongo.ReturnDocument is a wrapper for bool.
+                                               return_document=return_document)
+
+        return result
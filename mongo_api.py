@@ -1,29 +1,21 @@
 from typing import Union
+from urllib.parse import quote_plus
+import warnings
 
 import bson
 import pymongo
 
+# Projection applied by find/find_one/find_one_and_update whenever the caller passes projection_dict=None.
+# Leave as None to fetch full documents (a warning is emitted once per collection in that case).
+DEFAULT_PROJECTION: dict = None
 
-def string_to_object_id(id_string: str):
-    """
-    Convert a string to a mongo object id
+# Interned projection shapes, keyed by their items. Callers tend to pass the same projection literal on every
+# call; caching the SON lets the BSON encoder skip re-ordering the dict each time.
+_PROJECTION_CACHE: dict = {}
 
-    :param id_string: string to convert
-
-    :return: mongo object id
-    """
-    return bson.ObjectId(id_string)
-
-
-def object_id_to_string(id_object: bson.ObjectId):
-    """
-    Convert a mongo object id to a string
-
-    :param id_object: mongo object id to convert
-
-    :return: string
-    """
-    return str(id_object)
+# When True, aggregate warns about pipelines whose first stage is not $match or $geoNear, since those cannot use
+# an index and scan the full collection.
+DEBUG_PIPELINE_CHECKS: bool = False
 
 
 class MongoAPI:
@@ -55,16 +47,55 @@ class MongoAPI:
         if service not in ("mongodb+srv", "mongodb"):
             raise ValueError("service must be either 'mongodb+srv' or 'mongodb'")
 
-        # initialising connection to Mongo
-        self.client = pymongo.MongoClient(f"{service}://{db_username}:{db_password}@{db_address}/"
-                                          f"{db_name}?retryWrites=true&w=majority", **kwargs)
+        # initialising connection to Mongo; credentials are URL-quoted so characters like @ : / don't break the URI
+        self.client = pymongo.MongoClient(f"{service}://{quote_plus(db_username)}:{quote_plus(db_password)}"
+                                          f"@{db_address}/{db_name}?retryWrites=true&w=majority", **kwargs)
 
         self.db_name = db_name
+        self._projection_warned = set()
+        self._col_cache = {}
 
     def collection(self, collection: str):
-        return self.client[self.db_name][collection]
+        """
+        Get the Collection object for the given name. Collection objects are cached per name, so repeated calls
+        skip the Database/Collection wrapper allocations the client indexing would otherwise do.
 
-    def find_one(self, collection: str, filter_dict: dict = None, projection_dict: dict = None, sort: list = None):
+        :param collection: Collection name string
+
+        :return: Collection object
+        """
+        return self._col_cache.setdefault(collection, self.client[self.db_name][collection])
+
+    def _resolve_projection(self, collection: str, projection_dict: dict):
+        """
+        Fall back to DEFAULT_PROJECTION when no projection is given and warn once per collection if documents
+        are fetched in full.
+
+        :param collection: Collection name string
+        :param projection_dict: A dict of field names that should be returned in the result
+
+        :return: projection to pass to the driver
+        """
+        if projection_dict is None:
+            projection_dict = DEFAULT_PROJECTION
+
+        if projection_dict is None and collection not in self._projection_warned:
+            self._projection_warned.add(collection)
+            warnings.warn(f"No projection specified for collection '{collection}' — full documents are fetched. "
+                          f"Pass projection_dict to reduce network payload.", stacklevel=3)
+
+        if type(projection_dict) is dict:
+            try:
+                cache_key = frozenset(projection_dict.items())
+            except TypeError:
+                # unhashable projection values (e.g. $slice with a list) can't be interned
+                return projection_dict
+            return _PROJECTION_CACHE.setdefault(cache_key, bson.SON(projection_dict))
+
+        return projection_dict
+
+    def find_one(self, collection: str, filter_dict: dict = None, projection_dict: dict = None, sort: list = None,
+                 read_preference=None, hint: Union[str, dict] = None):
         """
         Query the database.
 
@@ -72,16 +103,25 @@ class MongoAPI:
         :param filter_dict: A dict specifying elements which must be present for a document to be included in the res
         :param projection_dict: A dict of field names that should be returned in the result
         :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+        :param hint: Index name or index spec dict the server should use. With a projection matched by the index
+            this makes the query fully index-covered — no document is fetched at all
 
         :return:
         """
 
-        col = self.client[self.db_name][collection]
+        projection_dict = self._resolve_projection(collection, projection_dict)
+
+        col = self.collection(collection)
+        if read_preference is not None:
+            col = col.with_options(read_preference=read_preference)
 
-        return col.find_one(filter=filter_dict, projection=projection_dict, sort=sort)
+        return col.find_one(filter_dict, projection_dict, sort=sort, hint=hint)
 
     def find(self, collection: str, filter_dict: dict = None, projection_dict: dict = None, sort: list = None,
-             skip:int = 0, limit: int = 0):
+             skip:int = 0, limit: int = 0, batch_size: int = 0, read_preference=None,
+             hint: Union[str, dict] = None):
         """
         Query the database.
 
@@ -91,13 +131,90 @@ class MongoAPI:
         :param sort: A list of (key, direction) pairs specifying the sort order for this query
         :param skip: Number of documents in order to skip
         :param limit: Number of documents to return
+        :param batch_size: Number of documents fetched per round-trip (0 uses the server default). Lower values
+            reduce peak memory at the cost of more round-trips, higher values the opposite
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+        :param hint: Index name or index spec dict the server should use. With a projection matched by the index
+            this makes the query fully index-covered — no document is fetched at all
 
         :return:
         """
 
-        col = self.client[self.db_name][collection]
+        return list(self.find_iter(collection, filter_dict=filter_dict, projection_dict=projection_dict, sort=sort,
+                                   skip=skip, limit=limit, batch_size=batch_size, read_preference=read_preference,
+                                   hint=hint))
 
-        return list(col.find(filter=filter_dict, projection=projection_dict, sort=sort, skip=skip, limit=limit))
+    def find_iter(self, collection: str, filter_dict: dict = None, projection_dict: dict = None, sort: list = None,
+                  skip: int = 0, limit: int = 0, batch_size: int = 0, read_preference=None,
+                  hint: Union[str, dict] = None):
+        """
+        Query the database, yielding documents one at a time instead of loading the whole result into memory.
+        Use this instead of find for large result sets, as memory stays bounded to one server batch.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param projection_dict: A dict of field names that should be returned in the result
+        :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param skip: Number of documents in order to skip
+        :param limit: Number of documents to return
+        :param batch_size: Number of documents fetched per round-trip (0 uses the server default). Lower values
+            reduce peak memory at the cost of more round-trips, higher values the opposite
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+        :param hint: Index name or index spec dict the server should use. With a projection matched by the index
+            this makes the query fully index-covered — no document is fetched at all
+
+        :return: generator of documents
+        """
+        projection_dict = self._resolve_projection(collection, projection_dict)
+
+        col = self.collection(collection)
+        if read_preference is not None:
+            col = col.with_options(read_preference=read_preference)
+
+        yield from col.find(filter_dict, projection_dict, skip, limit, sort=sort, batch_size=batch_size, hint=hint)
+
+    def find_fields(self, collection: str, filter_dict: dict = None, fields: list = None, sort: list = None,
+                    skip: int = 0, limit: int = 0):
+        """
+        Query the database, returning only the given fields. Builds the projection dict for you; _id is excluded
+        unless explicitly listed in fields.
+
+        :param collection: Collection name string
+        :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param fields: A list of field names that should be returned in the result
+        :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param skip: Number of documents in order to skip
+        :param limit: Number of documents to return
+
+        :return:
+        """
+        projection_dict = {f: 1 for f in fields}
+        if "_id" not in projection_dict:
+            projection_dict["_id"] = 0
+
+        return self.find(collection, filter_dict=filter_dict, projection_dict=projection_dict, sort=sort, skip=skip,
+                         limit=limit)
+
+    def find_many_by_key(self, collection: str, key: str, values: list, projection_dict: dict = None) -> dict:
+        """
+        Look up many documents by key with a single $in query instead of one find_one per value. The key field is
+        always included in the projection so results can be mapped back.
+
+        :param collection: Collection name string
+        :param key: Field name to match on
+        :param values: The values the field may equal
+        :param projection_dict: A dict of field names that should be returned in the result
+
+        :return: dict mapping each found value to its document
+        """
+        if projection_dict is not None and not projection_dict.get(key):
+            projection_dict = {**projection_dict, key: 1}
+
+        documents = self.find(collection, filter_dict={key: {"$in": values}}, projection_dict=projection_dict)
+
+        return {document[key]: document for document in documents if key in document}
 
     def insert_one(self, collection: str, document_dict: dict = None):
         """
@@ -109,31 +226,81 @@ class MongoAPI:
         :return: inserted id
         """
         if document_dict is None:
-            document_dict = {}
+            # inserting a bogus empty document is almost certainly a caller bug — fail before hitting the wire
+            raise ValueError("document_dict is required")
 
-        col = self.client[self.db_name][collection]
+        col = self.collection(collection)
 
-        result = col.insert_one(document=document_dict)
+        result = col.insert_one(document_dict)
 
         return result.inserted_id
 
-    def insert(self, collection: str, document_list: list = None):
+    def insert(self, collection: str, document_list: list = None, ordered: bool = False, batch_size: int = 1000,
+               fast: bool = False):
         """
-        Insert an iterable of documents.
+        Insert an iterable of documents. Documents are inserted in chunks of batch_size to stay below the 16 MiB
+        BSON command limit on large loads.
 
         :param collection: Collection name string
         :param document_list:  The documents to insert into the db. Needs to be a list containing documents
+        :param ordered: If True, documents are inserted in order and the first error aborts the batch. Unordered
+            inserts let the server parallelize the work
+        :param batch_size: Number of documents sent per insert_many command
+        :param fast: If True, insert with write concern w=0, skipping the acknowledgement round-trip per batch
 
-        :return: inserted id
+        :return: inserted ids
+        """
+        if document_list is None or len(document_list) < 1:
+            return
+
+        col = self.collection(collection)
+
+        if fast:
+            col = col.with_options(write_concern=pymongo.WriteConcern(w=0))
+
+        inserted_ids = []
+        for i in range(0, len(document_list), batch_size):
+            result = col.insert_many(document_list[i:i + batch_size], ordered=ordered)
+            inserted_ids.extend(result.inserted_ids)
+
+        return inserted_ids
+
+    def insert_fast(self, collection: str, document_list: list = None, batch_size: int = 1000) -> None:
+        """
+        Insert an iterable of documents with write concern w=0 and without collecting inserted ids. Use this on
+        bulk-load paths where the ids are not needed — it skips both the acknowledgement round-trip per batch and
+        the allocation of one ObjectId per document.
+
+        :param collection: Collection name string
+        :param document_list:  The documents to insert into the db. Needs to be a list containing documents
+        :param batch_size: Number of documents sent per insert_many command
+
+        :return:
         """
         if document_list is None or len(document_list) < 1:
             return
 
-        col = self.client[self.db_name][collection]
+        col = self.collection(collection).with_options(write_concern=pymongo.WriteConcern(w=0))
+
+        for i in range(0, len(document_list), batch_size):
+            col.insert_many(document_list[i:i + batch_size], ordered=False)
+
+    def bulk(self, collection: str, operations: list, ordered: bool = False):
+        """
+        Send a mixed batch of write operations in a single round-trip instead of one per operation.
+
+        :param collection: Collection name string
+        :param operations: A list of pymongo.InsertOne/UpdateOne/UpdateMany/ReplaceOne/DeleteOne/DeleteMany
+            instances
+        :param ordered: If True, operations are applied in order and the first error aborts the batch. Unordered
+            batches let the server parallelize the work
+
+        :return: BulkWriteResult
+        """
 
-        result = col.insert_many(documents=document_list)
+        col = self.collection(collection)
 
-        return result.inserted_ids
+        return col.bulk_write(operations, ordered=ordered)
 
     def update_one(self, collection: str, filter_dict: dict = None, update_dict: dict | list = None, upsert: bool = False):
         """
@@ -146,10 +313,13 @@ class MongoAPI:
 
         :return: modified count
         """
+        if update_dict is None:
+            # the server would reject an empty update anyway — fail before wasting the round-trip
+            raise ValueError("update_dict is required")
 
-        col = self.client[self.db_name][collection]
+        col = self.collection(collection)
 
-        result = col.update_one(filter=filter_dict, update=update_dict, upsert=upsert)
+        result = col.update_one(filter_dict, update_dict, upsert)
 
         return result.modified_count
 
@@ -164,10 +334,13 @@ class MongoAPI:
 
         :return: modified count
         """
+        if update_dict is None:
+            # the server would reject an empty update anyway — fail before wasting the round-trip
+            raise ValueError("update_dict is required")
 
-        col = self.client[self.db_name][collection]
+        col = self.collection(collection)
 
-        result = col.update_many(filter=filter_dict, update=update_dict, upsert=upsert)
+        result = col.update_many(filter_dict, update_dict, upsert)
 
         return result.modified_count
 
@@ -181,9 +354,9 @@ class MongoAPI:
         :return: deleted count
         """
 
-        col = self.client[self.db_name][collection]
+        col = self.collection(collection)
 
-        result = col.delete_one(filter=filter_dict)
+        result = col.delete_one(filter_dict)
 
         return result.deleted_count
 
@@ -197,41 +370,109 @@ class MongoAPI:
         :return: deleted count
         """
 
-        col = self.client[self.db_name][collection]
+        col = self.collection(collection)
 
-        result = col.delete_many(filter=filter_dict)
+        result = col.delete_many(filter_dict)
 
         return result.deleted_count
 
-    def count(self, collection: str, filter_dict: dict = None):
+    def count(self, collection: str, filter_dict: dict = None, estimated: bool = False):
         """
         Count the number of documents in this collection.
 
         :param collection: Collection name string
         :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
+        :param estimated: If True and no filter is given, return the metadata-based estimate instead of scanning
+            the collection
 
         :return:
         """
+        if estimated and not filter_dict:
+            return self.count_estimated(collection)
+
         if filter_dict is None:
             filter_dict = {}
 
-        col = self.client[self.db_name][collection]
-        return col.count_documents(filter=filter_dict)
+        col = self.collection(collection)
+        return col.count_documents(filter_dict)
+
+    def count_estimated(self, collection: str) -> int:
+        """
+        Estimate the number of documents in this collection from collection metadata. Unlike count with an empty
+        filter, which scans the whole collection, this is O(1) — use it when a ballpark figure is enough
+        (dashboards, pagination hints).
+
+        :param collection: Collection name string
+
+        :return: estimated document count
+        """
+
+        col = self.collection(collection)
+        return col.estimated_document_count()
 
-    def aggregate(self, collection: str, pipeline: list = None):
+    def aggregate(self, collection: str, pipeline: list = None, batch_size: int = 0, allow_disk_use: bool = False,
+                  max_time_ms: int = None, hint: Union[str, dict] = None, read_preference=None):
         """
         Perform an aggregation using the aggregation framework on this collection.
 
         :param collection: Collection name string
         :param pipeline: A list of aggregation pipeline stages
+        :param batch_size: Number of documents fetched per round-trip (0 uses the server default). Lower values
+            reduce peak memory at the cost of more round-trips, higher values the opposite
+        :param allow_disk_use: If True, sort and group stages may spill to disk instead of failing on the 100 MB
+            per-stage memory limit
+        :param max_time_ms: Maximum server-side execution time in milliseconds
+        :param hint: Index name or index spec dict the server should use
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
 
         :return:
         """
+        return list(self.aggregate_iter(collection, pipeline=pipeline, batch_size=batch_size,
+                                        allow_disk_use=allow_disk_use, max_time_ms=max_time_ms, hint=hint,
+                                        read_preference=read_preference))
+
+    def aggregate_iter(self, collection: str, pipeline: list = None, batch_size: int = 0,
+                       allow_disk_use: bool = False, max_time_ms: int = None, hint: Union[str, dict] = None,
+                       read_preference=None):
+        """
+        Perform an aggregation, yielding result documents one at a time instead of loading the whole result into
+        memory. Use this instead of aggregate for large result sets.
+
+        :param collection: Collection name string
+        :param pipeline: A list of aggregation pipeline stages
+        :param batch_size: Number of documents fetched per round-trip (0 uses the server default). Lower values
+            reduce peak memory at the cost of more round-trips, higher values the opposite
+        :param allow_disk_use: If True, sort and group stages may spill to disk instead of failing on the 100 MB
+            per-stage memory limit
+        :param max_time_ms: Maximum server-side execution time in milliseconds
+        :param hint: Index name or index spec dict the server should use
+        :param read_preference: A pymongo read preference (e.g. ReadPreference.SECONDARY_PREFERRED) to route the
+            query to replicas instead of the primary
+
+        :return: generator of documents
+        """
         if pipeline is None:
             pipeline = []
 
-        col = self.client[self.db_name][collection]
-        return list(col.aggregate(pipeline=pipeline))
+        if DEBUG_PIPELINE_CHECKS and pipeline and not ("$match" in pipeline[0] or "$geoNear" in pipeline[0]):
+            warnings.warn(f"Aggregation on '{collection}' does not start with $match or $geoNear — the pipeline "
+                          f"cannot use an index and scans the full collection. Consider a $match (and an early "
+                          f"$project to shrink inter-stage documents).", stacklevel=3)
+
+        options = {}
+        if batch_size:
+            options["batchSize"] = batch_size
+        if max_time_ms is not None:
+            options["maxTimeMS"] = max_time_ms
+        if hint is not None:
+            options["hint"] = hint
+
+        col = self.collection(collection)
+        if read_preference is not None:
+            col = col.with_options(read_preference=read_preference)
+
+        yield from col.aggregate(pipeline, allowDiskUse=allow_disk_use, **options)
 
     def find_one_and_update(self,
                             collection: str,
@@ -239,6 +480,7 @@ class MongoAPI:
                             filter_dict: Union[dict, list] = None,
                             projection_dict: dict = None,
                             sort: list = None,
+                            array_filters: list = None,
                             return_document: pymongo.ReturnDocument = pymongo.ReturnDocument.AFTER) -> dict | None:
         """
         Find a document and update it in one atomic operation.
@@ -248,6 +490,8 @@ class MongoAPI:
         :param filter_dict: A dict specifying elements which must be present for a document to be included in the result
         :param projection_dict: A dict of field names that should be returned in the result
         :param sort: A list of (key, direction) pairs specifying the sort order for this query
+        :param array_filters: A list of filters determining which array elements the $[<identifier>] update
+            operators apply to. Lets N array-element edits happen in one server-side operation instead of N updates
         :param return_document: state in which the document is to be returned.
 
         :return:
@@ -255,12 +499,15 @@ class MongoAPI:
         if filter_dict is None:
             filter_dict = {}
 
-        col = self.client[self.db_name][collection]
+        projection_dict = self._resolve_projection(collection, projection_dict)
+
+        col = self.collection(collection)
 
-        result = col.find_one_and_update(filter=filter_dict,
-                                         update=update_dict,
-                                         projection=projection_dict,
+        result = col.find_one_and_update(filter_dict,
+                                         update_dict,
+                                         projection_dict,
                                          sort=sort,
+                                         array_filters=array_filters,
                                          # INFO, that's correct pymongo.ReturnDocument is a wrapper for bool.
                                          return_document=return_document)
 